@@ -2,9 +2,36 @@
 Script para corrigir problemas de dependências do OpenAI
 """
 
+import re
 import subprocess
 import sys
 
+# Eventos do pip mostrados em tempo real durante o lote
+_PIP_EVENT = re.compile(r'^(Collecting|Successfully installed|Successfully uninstalled|ERROR:)')
+
+def run_pip(cmd):
+    """
+    Executa o pip mostrando o progresso por pacote à medida que acontece.
+    
+    Returns:
+        Tupla (código de saída, linhas de erro)
+    """
+    errors = []
+    proc = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1
+    )
+    for line in proc.stdout:
+        line = line.rstrip()
+        if _PIP_EVENT.match(line):
+            print(f"   {line}")
+        if line.startswith(("ERROR:", "WARNING:")):
+            errors.append(line)
+    return proc.wait(), errors
+
 def fix_openai_dependencies():
     """Corrige as dependências do OpenAI."""
     
@@ -13,22 +40,27 @@ def fix_openai_dependencies():
     # Lista de comandos para executar
     commands = [
         # Desinstala versões problemáticas
-        f"{sys.executable} -m pip uninstall -y openai httpx httpcore",
-        
-        # Reinstala com versões compatíveis
-        f"{sys.executable} -m pip install openai==1.3.0",
-        f"{sys.executable} -m pip install httpx==0.25.0",
+        [sys.executable, "-m", "pip", "uninstall", "-y", "openai", "httpx", "httpcore"],
         
-        # Reinstala outras dependências
-        f"{sys.executable} -m pip install pinecone-client==2.2.4 python-dotenv==1.0.1 tqdm==4.66.4"
+        # Reinstala com versões compatíveis e as demais dependências numa única
+        # chamada: o pip resolve e baixa o conjunto inteiro de uma vez
+        # (--prefer-binary evita compilar do código-fonte quando há wheel disponível)
+        [sys.executable, "-m", "pip", "install", "--prefer-binary",
+         "--disable-pip-version-check", "--progress-bar", "off",
+         "openai==1.3.0",
+         "httpx==0.25.0",
+         "pinecone-client==2.2.4",
+         "python-dotenv==1.0.1",
+         "tqdm==4.66.4"]
     ]
     
     for cmd in commands:
-        print(f"\n📦 Executando: {cmd}")
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        print(f"\n📦 Executando: {' '.join(cmd)}")
+        returncode, errors = run_pip(cmd)
         
-        if result.returncode != 0:
-            print(f"⚠️  Aviso: {result.stderr}")
+        if returncode != 0:
+            detail = "\n".join(errors) or f"pip saiu com código {returncode}"
+            print(f"⚠️  Aviso: {detail}")
         else:
             print("✅ OK")
     
@@ -10,6 +10,7 @@ import sys
 import os
 
 # CORREÇÃO: Importar requests ao invés de usar o cliente OpenAI
+import orjson
 import requests
 from pinecone import Pinecone
 from tqdm import tqdm
@@ -44,6 +45,10 @@ class PineconeEmbeddingPipeline:
             "Content-Type": "application/json"
         }
         
+        # Sessão persistente: reaproveita a conexão TLS entre os lotes
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        
         logger.info("Cliente OpenAI configurado via requests")
         
         # Inicializa Pinecone
@@ -59,9 +64,8 @@ class PineconeEmbeddingPipeline:
                 "model": "text-embedding-3-small"
             }
             
-            response = requests.post(
+            response = self.session.post(
                 self.openai_url,
-                headers=self.headers,
                 json=data
             )
             
@@ -70,7 +74,8 @@ class PineconeEmbeddingPipeline:
                 logger.error(f"Resposta: {response.text}")
                 return []
             
-            result = response.json()
+            # orjson é bem mais rápido que o json padrão para os vetores grandes da resposta
+            result = orjson.loads(response.content)
             embeddings = [item['embedding'] for item in result['data']]
             return embeddings
             
@@ -5,21 +5,47 @@ Execute este script para ter o sistema funcionando rapidamente.
 
 import os
 import sys
+import runpy
+import argparse
+import traceback
 from pathlib import Path
 
 # Adiciona o diretório ao path
 current_dir = Path(__file__).parent
 sys.path.insert(0, str(current_dir))
 
-def run_command(command, description):
+def run_script(script):
+    """
+    Executa um script Python no próprio interpretador, como se fosse __main__.
+    
+    Evita subir um novo processo por etapa e reaproveita os módulos já importados.
+    """
+    saved_argv = sys.argv
+    sys.argv = [script]
+    try:
+        runpy.run_path(script, run_name="__main__")
+        return True
+    except SystemExit as e:
+        return e.code in (None, 0)
+    except Exception:
+        traceback.print_exc()
+        return False
+    finally:
+        sys.argv = saved_argv
+
+
+def run_command(command, description, isolated=False):
     """Executa um comando Python."""
     print(f"\n{'='*60}")
     print(f"🔧 {description}")
     print(f"{'='*60}")
     
-    result = os.system(f"{sys.executable} {command}")
+    if isolated:
+        success = os.system(f"{sys.executable} {command}") == 0
+    else:
+        success = run_script(command)
     
-    if result == 0:
+    if success:
         print(f"✓ {description} - Concluído!")
         return True
     else:
@@ -29,6 +55,14 @@ def run_command(command, description):
 
 def main():
     """Executa o setup rápido do sistema."""
+    parser = argparse.ArgumentParser(description="Setup rápido do sistema RAG")
+    parser.add_argument(
+        '--isolated',
+        action='store_true',
+        help='Executa cada etapa num processo Python separado'
+    )
+    args = parser.parse_args()
+    
     print("QUICK START - Sistema RAG UFCSPA")
     print("="*60)
     
@@ -42,7 +76,7 @@ def main():
     all_success = True
     
     for script, description in steps:
-        if not run_command(script, description):
+        if not run_command(script, description, isolated=args.isolated):
             all_success = False
             print(f"\n❌ Erro na etapa: {description}")
             print("Verifique as mensagens de erro acima.")
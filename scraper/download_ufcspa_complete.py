@@ -28,6 +28,14 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Palavras-chave compiladas numa única alternância (busca em C, sem .lower() por link)
+_PDF_LINK = re.compile(r'pdf|/download/|arquivo|documento', re.I)
+_RELEVANT_KEYWORDS = re.compile(
+    r'norma|regimento|estatuto|resolucao|portaria|regulamento|legislacao|'
+    r'documento|conselho|consepe|consun|deliberacao|instrucao',
+    re.I
+)
+
 
 class UFCSPAScraper:
     """Scraper completo para UFCSPA com múltiplas estratégias."""
@@ -136,7 +144,7 @@ class UFCSPAScraper:
                 logger.warning(f"Status {response.status_code} para {url}")
                 return []
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = BeautifulSoup(response.content, 'html.parser')
             pdfs = []
             
             # Busca links diretos para PDFs
@@ -167,14 +175,8 @@ class UFCSPAScraper:
     
     def _is_pdf_link(self, href: str) -> bool:
         """Verifica se é link para PDF."""
-        href_lower = href.lower()
-        return (
-            href_lower.endswith('.pdf') or
-            'pdf' in href_lower or
-            '/download/' in href_lower or
-            'arquivo' in href_lower or
-            'documento' in href_lower
-        )
+        # '.pdf' no final já está coberto pela busca de 'pdf'
+        return _PDF_LINK.search(href) is not None
     
     def _is_relevant_link(self, href: str) -> bool:
         """Verifica se é link relevante para normas."""
@@ -186,14 +188,7 @@ class UFCSPAScraper:
             return False
         
         # Palavras-chave relevantes
-        keywords = [
-            'norma', 'regimento', 'estatuto', 'resolucao', 'portaria',
-            'regulamento', 'legislacao', 'documento', 'conselho',
-            'consepe', 'consun', 'deliberacao', 'instrucao'
-        ]
-        
-        href_lower = href.lower()
-        return any(kw in href_lower for kw in keywords)
+        return _RELEVANT_KEYWORDS.search(href) is not None
     
     def _generate_url_patterns(self) -> List[str]:
         """Gera padrões de URL para testar."""
@@ -261,7 +256,7 @@ class UFCSPAScraper:
             response.raise_for_status()
             
             # Gera nome do arquivo
-            url_hash = hashlib.md5(url.encode()).hexdigest()[:8]
+            url_hash = hashlib.blake2b(url.encode(), digest_size=4).hexdigest()
             filename = self._extract_filename(url, response.headers)
             if not filename:
                 filename = f"{url_hash}.pdf"
@@ -272,7 +267,7 @@ class UFCSPAScraper:
             
             # Baixa o arquivo
             with open(filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
+                for chunk in response.iter_content(chunk_size=65536):
                     if chunk:
                         f.write(chunk)
             
@@ -329,12 +324,25 @@ Modalidades: programas, projetos, cursos, eventos, prestação de serviços.""",
 O Reitor é a autoridade executiva máxima."""
         }
         
+        updated = 0
         for filename, content in samples.items():
-            filepath = samples_dir / filename
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(content)
+            if self._write_if_changed(samples_dir / filename, content.encode('utf-8')):
+                updated += 1
         
-        print(f"✅ {len(samples)} arquivos de exemplo criados em data/processed/")
+        print(f"✅ {len(samples)} arquivos de exemplo em data/processed/ "
+              f"({updated} atualizados, {len(samples) - updated} inalterados)")
+    
+    @staticmethod
+    def _write_if_changed(path: Path, data: bytes) -> bool:
+        """Grava o arquivo só se o conteúdo mudou (preserva o mtime dos inalterados)."""
+        # Um único stat responde "existe?" e "tem o mesmo tamanho?"
+        try:
+            if path.stat().st_size == len(data) and path.read_bytes() == data:
+                return False
+        except FileNotFoundError:
+            pass
+        path.write_bytes(data)
+        return True
     
     def _save_report(self, pdfs: List[str]):
         """Salva relatório do scraping."""
@@ -347,8 +355,8 @@ O Reitor é a autoridade executiva máxima."""
         }
         
         report_file = self.output_dir / "scraping_report.json"
-        with open(report_file, 'w', encoding='utf-8') as f:
-            json.dump(report, f, ensure_ascii=False, indent=2)
+        # Serializa tudo em memória e grava com uma única escrita
+        report_file.write_bytes(json.dumps(report, ensure_ascii=False, indent=2).encode('utf-8'))
         
         logger.info(f"Relatório salvo em: {report_file}")
 
@@ -0,0 +1,16 @@
+"""
+Pipelines do Scrapy para o projeto UFCSPA Spider.
+"""
+
+from scrapy.pipelines.files import FilesPipeline
+
+
+class UFCSPAFilesPipeline(FilesPipeline):
+    """FilesPipeline que mantém o esquema de nomes de arquivo do spider."""
+    
+    def file_path(self, request, response=None, info=None, *, item=None):
+        """Salva os PDFs direto em FILES_STORE com o nome gerado pelo spider."""
+        spider = info.spider if info else None
+        if hasattr(spider, '_generate_pdf_filename'):
+            return spider._generate_pdf_filename(request.url)
+        return super().file_path(request, response=response, info=info, item=item)
@@ -2,6 +2,8 @@
 Configurações do Scrapy para o projeto UFCSPA Spider.
 """
 
+import os
+
 # Nome do bot
 BOT_NAME = 'ufcspa_scraper'
 
@@ -13,9 +15,9 @@ NEWSPIDER_MODULE = 'scraper'
 ROBOTSTXT_OBEY = True
 
 # Configurações de concorrência
-CONCURRENT_REQUESTS = 16
+# Ritmo conservador (~1 req/s) com o único host da UFCSPA; ver HTTP/2 no fim do arquivo
+CONCURRENT_REQUESTS = 8
 CONCURRENT_REQUESTS_PER_DOMAIN = 8
-DOWNLOAD_DELAY = 0.5
 
 # Configurações de User-Agent
 USER_AGENT = 'ufcspa_scraper (+http://www.yourdomain.com)'
@@ -24,6 +26,7 @@ USER_AGENT = 'ufcspa_scraper (+http://www.yourdomain.com)'
 COOKIES_ENABLED = False
 
 # Configurações de middleware
+# (HttpCompressionMiddleware também aceita 'br' se brotli estiver instalado: pip install brotli)
 DOWNLOADER_MIDDLEWARES = {
     'scrapy.downloadermiddlewares.useragent.UserAgentMiddleware': None,
     'scrapy.downloadermiddlewares.retry.RetryMiddleware': 90,
@@ -32,9 +35,14 @@ DOWNLOADER_MIDDLEWARES = {
 
 # Configurações de pipeline
 ITEM_PIPELINES = {
-    # Adicione pipelines customizados aqui se necessário
+    'scraper.pipelines.UFCSPAFilesPipeline': 1,
 }
 
+# Download de PDFs via FilesPipeline
+FILES_STORE = 'data/raw'
+FILES_EXPIRES = 90
+MEDIA_ALLOW_REDIRECTS = True
+
 # Configurações de retry
 RETRY_ENABLED = True
 RETRY_TIMES = 3
@@ -43,6 +51,9 @@ RETRY_HTTP_CODES = [500, 502, 503, 504, 408, 429]
 # Configurações de timeout
 DOWNLOAD_TIMEOUT = 30
 
+# Tamanho máximo de resposta (PDFs digitalizados podem ser grandes)
+DOWNLOAD_MAXSIZE = 2 * 1024 * 1024 * 1024
+
 # Configurações de cache HTTP (desabilitado por padrão)
 HTTPCACHE_ENABLED = False
 HTTPCACHE_EXPIRATION_SECS = 0
@@ -54,7 +65,7 @@ LOG_LEVEL = 'INFO'
 LOG_FORMAT = '%(levelname)s: %(message)s'
 
 # Configurações de largura de banda
-DOWNLOAD_DELAY = 0.5
+DOWNLOAD_DELAY = 1
 RANDOMIZE_DOWNLOAD_DELAY = True
 AUTOTHROTTLE_ENABLED = True
 AUTOTHROTTLE_START_DELAY = 0.5
@@ -62,13 +73,21 @@ AUTOTHROTTLE_MAX_DELAY = 10
 AUTOTHROTTLE_TARGET_CONCURRENCY = 8.0
 AUTOTHROTTLE_DEBUG = False
 
-# Respeitar meta tags
-ROBOTSTXT_OBEY = True
-
-# Configurações de memória
-CONCURRENT_ITEMS = 100
-
 # Configurações de DNS
 DNSCACHE_ENABLED = True
 DNSCACHE_SIZE = 10000
-DNS_TIMEOUT = 60
\ No newline at end of file
+DNS_TIMEOUT = 60
+REACTOR_THREADPOOL_MAXSIZE = 20
+
+# HTTP/2 (opcional): multiplexa as requisições ao mesmo host numa única conexão TLS,
+# o que permite subir a concorrência sem abrir dezenas de conexões ao site.
+# Só é ativado com SCRAPY_HTTP2=1, pois depende do pacote h2 (pip install "Twisted[http2]");
+# sem ele o handler não carrega e todas as URLs https seriam rejeitadas.
+if os.getenv('SCRAPY_HTTP2') == '1':
+    DOWNLOAD_HANDLERS = {
+        'https': 'scrapy.core.downloader.handlers.http2.H2DownloadHandler',
+    }
+    CONCURRENT_REQUESTS = 32
+    CONCURRENT_REQUESTS_PER_DOMAIN = 32
+    # O ritmo por domínio fica a cargo do AutoThrottle
+    DOWNLOAD_DELAY = 0
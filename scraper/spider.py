@@ -7,8 +7,8 @@ Versão mais direta que funciona melhor para páginas específicas.
 import hashlib
 import logging
 import os
-from pathlib import Path
-from typing import Dict, Generator
+import re
+from typing import Generator
 from urllib.parse import urljoin, urlparse
 
 import scrapy
@@ -16,6 +16,14 @@ from scrapy import Request, Spider
 from scrapy.http import Response
 
 
+# Palavras-chave de páginas relevantes, compiladas uma única vez
+_RELEVANT_URL = re.compile(
+    r'norma|regimento|estatuto|resolucao|portaria|regulamento|legislacao'
+    r'|conselho|deliberacao|instrucao|sobre-a-ufcspa',
+    re.IGNORECASE
+)
+
+
 class UFCSPASpiderSimple(Spider):
     """Spider simplificado para coletar PDFs da UFCSPA."""
     
@@ -26,17 +34,20 @@ class UFCSPASpiderSimple(Spider):
     custom_settings = {
         'LOG_LEVEL': 'INFO',
         'ROBOTSTXT_OBEY': True,
-        'CONCURRENT_REQUESTS': 8,
-        'DOWNLOAD_DELAY': 1,
         'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
     }
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.pdf_dir = Path("data/raw")
-        self.pdf_dir.mkdir(parents=True, exist_ok=True)
         self.visited_urls = set()
         
+        # Casa o host (e subdomínios) dos domínios permitidos direto na URL, sem urlparse
+        domains = '|'.join(re.escape(domain) for domain in self.allowed_domains)
+        self._allowed_url = re.compile(
+            rf'https?://(?:[^/?#]*\.)?(?:{domains})(?:[:/?#]|$)',
+            re.IGNORECASE
+        )
+        
     def parse(self, response: Response) -> Generator:
         """Processa a página inicial e busca por links."""
         self.logger.info(f"Processando página: {response.url}")
@@ -44,25 +55,26 @@ class UFCSPASpiderSimple(Spider):
         # Marca URL como visitada
         self.visited_urls.add(response.url)
         
-        # Busca por links de PDFs diretos
-        pdf_links = response.css('a[href$=".pdf"]::attr(href)').getall()
-        pdf_links.extend(response.css('a[href*=".pdf"]::attr(href)').getall())
-        
-        # Remove duplicatas
-        pdf_links = list(set(pdf_links))
+        # Busca por links de PDFs (contains cobre também os que terminam em .pdf);
+        # XPath direto evita a tradução CSS -> XPath a cada página
+        pdf_links = set(response.xpath('//a[contains(@href, ".pdf")]/@href').getall())
         
         self.logger.info(f"Encontrados {len(pdf_links)} links para PDFs")
         
+        # Os downloads ficam a cargo do FilesPipeline (ver settings.py), que
+        # deduplica as URLs e não baixa de novo arquivos ainda válidos no disco
+        pdf_urls = []
         for pdf_link in pdf_links:
             pdf_url = urljoin(response.url, pdf_link)
             if self._is_valid_url(pdf_url):
                 self.logger.info(f"Baixando PDF: {pdf_url}")
-                yield Request(
-                    url=pdf_url,
-                    callback=self.save_pdf,
-                    dont_filter=True,
-                    meta={'source_page': response.url}
-                )
+                pdf_urls.append(pdf_url)
+        
+        if pdf_urls:
+            yield {
+                'file_urls': pdf_urls,
+                'source_page': response.url
+            }
         
         # Busca por links para outras páginas de normas
         all_links = response.css('a::attr(href)').getall()
@@ -82,50 +94,17 @@ class UFCSPASpiderSimple(Spider):
                     dont_filter=True
                 )
     
-    def save_pdf(self, response: Response) -> Dict:
-        """Salva um arquivo PDF."""
-        try:
-            filename = self._generate_pdf_filename(response.url)
-            filepath = self.pdf_dir / filename
-            
-            with open(filepath, 'wb') as f:
-                f.write(response.body)
-            
-            self.logger.info(f"PDF salvo: {filename} ({len(response.body)} bytes)")
-            
-            return {
-                'url': response.url,
-                'filename': filename,
-                'size': len(response.body),
-                'source_page': response.meta.get('source_page', '')
-            }
-            
-        except Exception as e:
-            self.logger.error(f"Erro ao salvar PDF {response.url}: {str(e)}")
-            return {'error': str(e)}
-    
     def _is_valid_url(self, url: str) -> bool:
         """Verifica se a URL é válida e está no domínio permitido."""
-        try:
-            parsed = urlparse(url)
-            return any(domain in parsed.netloc for domain in self.allowed_domains)
-        except:
-            return False
+        return self._allowed_url.match(url) is not None
     
     def _is_relevant_url(self, url: str) -> bool:
         """Verifica se a URL é relevante para normas."""
-        relevant_keywords = [
-            'norma', 'regimento', 'estatuto', 'resolucao', 
-            'portaria', 'regulamento', 'legislacao', 'conselho',
-            'deliberacao', 'instrucao', 'sobre-a-ufcspa'
-        ]
-        
-        url_lower = url.lower()
-        return any(keyword in url_lower for keyword in relevant_keywords)
+        return _RELEVANT_URL.search(url) is not None
     
     def _generate_pdf_filename(self, url: str) -> str:
         """Gera nome único para o PDF."""
-        url_hash = hashlib.md5(url.encode()).hexdigest()[:8]
+        url_hash = hashlib.blake2b(url.encode(), digest_size=4).hexdigest()
         
         parsed = urlparse(url)
         original_name = os.path.basename(parsed.path)
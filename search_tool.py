@@ -1,10 +1,39 @@
-import requests
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import diskcache
+import httpx
+import numpy as np
+import orjson
 from pinecone import Pinecone
 import config
 import logging
+import time
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+OPENAI_EMBEDDINGS_URL = "https://api.openai.com/v1/embeddings"
+
+# Cache persistente de embeddings (sobrevive a reinicializações do processo)
+EMBEDDING_CACHE_DIR = ".cache/embeddings"
+EMBEDDING_CACHE_TTL = 30 * 86400
+
+# Camada em memória (LRU) na frente do cache em disco para queries repetidas
+EMBEDDING_MEMORY_CACHE_SIZE = 4096
+
+# Máximo de textos por chamada ao endpoint de embeddings (a API aceita até 2048)
+MAX_EMBEDDING_BATCH = 64
+
+# Queries simultâneas ao Pinecone em search_batch
+MAX_CONCURRENT_QUERIES = 8
+
+# Novas tentativas para respostas transitórias da API (backoff exponencial)
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.2
+
 class VectorSearchTool:
     def __init__(self):
         try:
@@ -15,6 +44,28 @@ class VectorSearchTool:
                 "Content-Type": "application/json"
             }
             
+            # Cliente HTTP/2 compartilhado entre chamadas (reaproveita a conexão TLS)
+            # (com transport explícito, http2/limits são configurados nele)
+            self._http = httpx.Client(
+                headers=self.headers,
+                timeout=30.0,
+                transport=httpx.HTTPTransport(
+                    http2=True,
+                    retries=MAX_RETRIES,
+                    limits=httpx.Limits(max_connections=20, max_keepalive_connections=20)
+                )
+            )
+            
+            # Prefixo fixo do corpo JSON (o modelo não muda): só a lista de entradas é serializada por chamada
+            self._body_prefix = b'{"model":' + orjson.dumps(config.EMBEDDING_MODEL) + b',"input":'
+            
+            self._emb_cache = diskcache.Cache(EMBEDDING_CACHE_DIR)
+            self._emb_memory = OrderedDict()
+            self._emb_memory_lock = threading.Lock()
+            
+            # Pool fixo para as queries concorrentes ao Pinecone (reutilizado entre lotes)
+            self._query_pool = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_QUERIES, thread_name_prefix="pinecone-query")
+            
             # Nova sintaxe do Pinecone
             self.pc = Pinecone(api_key=config.PINECONE_API_KEY)
             self.pinecone_index = self.pc.Index(config.PINECONE_INDEX_NAME)
@@ -23,20 +74,71 @@ class VectorSearchTool:
             logging.error(f"Erro ao inicializar a VectorSearchTool: {e}")
             raise
 
-    def _get_embedding(self, text: str) -> list[float]:
+    def _get_embedding(self, text: str) -> np.ndarray:
+        return self._get_embeddings([text])[0]
+
+    def _cache_key(self, text: str) -> str:
+        return hashlib.sha256(f"{config.EMBEDDING_MODEL}|{text}".encode()).hexdigest()
+
+    def _memory_get(self, key: str):
+        with self._emb_memory_lock:
+            embedding = self._emb_memory.get(key)
+            if embedding is not None:
+                self._emb_memory.move_to_end(key)
+            return embedding
+
+    def _memory_put(self, key: str, embedding: np.ndarray):
+        # Vetores compartilhados entre chamadas ficam somente leitura
+        embedding.flags.writeable = False
+        with self._emb_memory_lock:
+            self._emb_memory[key] = embedding
+            self._emb_memory.move_to_end(key)
+            if len(self._emb_memory) > EMBEDDING_MEMORY_CACHE_SIZE:
+                self._emb_memory.popitem(last=False)
+
+    def _get_embeddings(self, texts: list[str]) -> list[np.ndarray]:
+        keys = [self._cache_key(text) for text in texts]
+        embeddings = []
+        for key in keys:
+            embedding = self._memory_get(key)
+            if embedding is None:
+                cached = self._emb_cache.get(key)
+                if cached is not None:
+                    embedding = np.frombuffer(cached, dtype=np.float32)
+                    self._memory_put(key, embedding)
+            embeddings.append(embedding)
+        
+        # Só os textos ausentes do cache vão para a API, em lotes de até MAX_EMBEDDING_BATCH
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        for start in range(0, len(missing), MAX_EMBEDDING_BATCH):
+            batch = missing[start:start + MAX_EMBEDDING_BATCH]
+            fetched = self._request_embeddings([texts[i] for i in batch])
+            for i, embedding in zip(batch, fetched):
+                self._emb_cache.set(keys[i], embedding.tobytes(), expire=EMBEDDING_CACHE_TTL)
+                self._memory_put(keys[i], embedding)
+                embeddings[i] = embedding
+        return embeddings
+
+    def _parse_embeddings(self, content: bytes) -> list[np.ndarray]:
+        # orjson decodifica o corpo direto dos bytes; os vetores viram float32 uma única vez
+        return [np.asarray(item['embedding'], dtype=np.float32) for item in orjson.loads(content)['data']]
+
+    def _embedding_body(self, texts) -> bytes:
+        return self._body_prefix + orjson.dumps(texts) + b'}'
+
+    def _request_embeddings(self, texts: list[str]) -> list[np.ndarray]:
         try:
-            response = requests.post(
-                "https://api.openai.com/v1/embeddings",
-                headers=self.headers,
-                json={
-                    "input": text,
-                    "model": config.EMBEDDING_MODEL
-                },
-                timeout=30
-            )
+            # O endpoint aceita uma lista de entradas: um único round-trip para o lote
+            body = self._embedding_body(list(texts))
+            # Falhas de conexão já são repetidas pelo transport; aqui tratamos 429/5xx
+            for attempt in range(MAX_RETRIES + 1):
+                response = self._http.post(OPENAI_EMBEDDINGS_URL, content=body)
+                if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                    break
+                time.sleep(RETRY_BACKOFF * 2 ** attempt)
             
             if response.status_code == 200:
-                return response.json()['data'][0]['embedding']
+                return self._parse_embeddings(response.content)
             else:
                 logging.error(f"Erro na API OpenAI: {response.status_code} - {response.text}")
                 raise Exception("Erro ao gerar embedding")
@@ -45,23 +147,66 @@ class VectorSearchTool:
             logging.error(f"Erro ao gerar embedding: {e}")
             raise
 
-    def search(self, query: str, top_k: int = 5) -> list[str]:
+    async def aembed_batch(self, texts: list[str]) -> list[np.ndarray]:
+        """Gera embeddings sem bloquear o event loop (mesmos caches, lotes e retries da versão síncrona)."""
+        return await asyncio.to_thread(self._get_embeddings, texts)
+
+    def _query(self, vector: np.ndarray, top_k: int, min_score: float = 0.0) -> list[str]:
+        results = self.pinecone_index.query(vector=vector.tolist(), top_k=top_k, include_metadata=True, include_values=False)
+        # QueryResponse tipado: acesso por atributo, uma única passada pelos matches.
+        # O filtro de score só vale com min_score > 0 (scores de cosseno podem ser negativos)
+        return [
+            match.metadata['text']
+            for match in results.matches
+            if (min_score <= 0 or match.score >= min_score) and match.metadata and 'text' in match.metadata
+        ]
+
+    def search(self, query: str, top_k: int = 5, min_score: float = 0.0) -> list[str]:
         logging.info(f"Recebida nova busca: '{query}'")
         try:
             query_vector = self._get_embedding(query)
-            results = self.pinecone_index.query(vector=query_vector, top_k=top_k, include_metadata=True)
-            context_list = [match['metadata']['text'] for match in results['matches'] if 'metadata' in match and 'text' in match['metadata']]
+            context_list = self._query(query_vector, top_k, min_score)
+            logging.info(f"Encontrados {len(context_list)} resultados relevantes.")
+            return context_list
+        except Exception as e:
+            logging.error(f"Erro durante a busca: {e}")
+            return []
+
+    def search_batch(self, queries: list[str], top_k: int = 5, min_score: float = 0.0) -> list[list[str]]:
+        logging.info(f"Recebido lote de {len(queries)} buscas")
+        if not queries:
+            return []
+        try:
+            query_vectors = self._get_embeddings(queries)
+            return list(self._query_pool.map(lambda vector: self._query(vector, top_k, min_score), query_vectors))
+        except Exception as e:
+            logging.error(f"Erro durante a busca em lote: {e}")
+            return [[] for _ in queries]
+
+    async def asearch(self, query: str, top_k: int = 5, min_score: float = 0.0) -> list[str]:
+        logging.info(f"Recebida nova busca assíncrona: '{query}'")
+        try:
+            # Os clientes HTTP e Pinecone são síncronos e thread-safe: rodam fora do event loop
+            query_vector = await asyncio.to_thread(self._get_embedding, query)
+            context_list = await asyncio.to_thread(self._query, query_vector, top_k, min_score)
             logging.info(f"Encontrados {len(context_list)} resultados relevantes.")
             return context_list
         except Exception as e:
             logging.error(f"Erro durante a busca: {e}")
             return []
 
+    async def asearch_batch(self, queries: list[str], top_k: int = 5, min_score: float = 0.0) -> list[list[str]]:
+        return await asyncio.gather(*(self.asearch(query, top_k, min_score) for query in queries))
+
 search_tool_instance = VectorSearchTool()
 
 def search_vectorstore(query: str) -> list[str]:
     return search_tool_instance.search(query)
 
+async def asearch_vectorstore(query: str) -> list[str]:
+    """Versão assíncrona para chamadores concorrentes (não bloqueia o event loop)."""
+    return await search_tool_instance.asearch(query)
+
 if __name__ == '__main__':
     print("Executando teste da ferramenta de busca...")
     pergunta_exemplo = "Quais são as normas para atividades de extensão universitária?"
@@ -7,22 +7,34 @@ Esta versão implementa:
 2. Deduplicação de conteúdo
 3. Chunking semântico que preserva contexto
 4. Busca vetorial eficiente com FAISS
-5. Preparação para re-ranking futuro
+5. Re-ranking opcional com Cross-Encoder
 """
 
 import os
+import re
+import uuid
+import json
 import hashlib
 import logging
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
-import pickle
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 
+import faiss
+import numpy as np
+from datasketch import MinHash, MinHashLSH
 from langchain.document_loaders import DirectoryLoader, TextLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.embeddings import HuggingFaceEmbeddings
+from langchain.embeddings.base import Embeddings
 from langchain.vectorstores import FAISS
+from langchain.vectorstores.utils import DistanceStrategy
+from langchain.docstore.in_memory import InMemoryDocstore
 from langchain.schema import Document
+from sentence_transformers import CrossEncoder
 from tqdm import tqdm
+from transformers import AutoTokenizer, PreTrainedTokenizerBase
 
 # Configuração de logging
 logging.basicConfig(
@@ -31,6 +43,127 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Parâmetros do índice HNSW (busca aproximada sub-linear)
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+
+# Textos por lote na codificação do sentence-transformers (padrão da lib: 32)
+EMBEDDING_BATCH_SIZE = 128
+
+# Deduplicação aproximada (MinHash/LSH sobre 3-gramas de palavras)
+NEAR_DUPLICATE_THRESHOLD = 0.9
+MINHASH_NUM_PERM = 128
+
+# Manifesto dos arquivos indexados (mtime, tamanho, hash) para evitar reprocessamento
+MANIFEST_FILE = "file_hashes.json"
+
+# Intervalo mínimo (s) entre atualizações das barras de progresso
+PROGRESS_MIN_INTERVAL = 0.5
+
+# Chunks com até esse número de caracteres são fundidos ao vizinho
+MIN_CHUNK_CHARS = 50
+
+# Abaixo disso o custo de subir os processos não compensa
+PARALLEL_CHUNKING_MIN_DOCUMENTS = 32
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _build_text_splitter(
+    chunk_size: int,
+    chunk_overlap: int,
+    tokenizer_name: str
+) -> Tuple[RecursiveCharacterTextSplitter, PreTrainedTokenizerBase]:
+    """
+    Cria o splitter com hierarquia de separadores.
+    
+    Prioriza quebras por: parágrafos duplos > parágrafo único > linha > ponto > espaço.
+    Os tamanhos são medidos em tokens do próprio modelo de embeddings, para que
+    nenhum chunk passe do limite de entrada do modelo e seja truncado.
+    
+    Returns:
+        O splitter e o tokenizer usado para medir os chunks
+    """
+    tokenizer = AutoTokenizer.from_pretrained(tokenizer_name)
+    splitter = RecursiveCharacterTextSplitter.from_huggingface_tokenizer(
+        tokenizer,
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        separators=[
+            "\n\n\n",  # Múltiplas quebras (seções)
+            "\n\n",    # Parágrafos
+            "\n",      # Linhas
+            ". ",      # Sentenças
+            "! ",      # Exclamações
+            "? ",      # Perguntas
+            "; ",      # Ponto e vírgula
+            ", ",      # Vírgulas
+            " ",       # Espaços
+            ""         # Caracteres individuais (último recurso)
+        ]
+    )
+    return splitter, tokenizer
+
+
+# Splitter próprio de cada processo worker (criado uma vez no initializer)
+_worker_splitter = None
+
+
+def _init_chunking_worker(chunk_size: int, chunk_overlap: int, tokenizer_name: str):
+    global _worker_splitter
+    _worker_splitter, _ = _build_text_splitter(chunk_size, chunk_overlap, tokenizer_name)
+
+
+def _split_document(doc: Document) -> List[Document]:
+    return _worker_splitter.split_documents([doc])
+
+
+def _distance_strategy_for(index) -> DistanceStrategy:
+    """Estratégia de distância correspondente à métrica gravada no índice FAISS."""
+    if index.metric_type == faiss.METRIC_INNER_PRODUCT:
+        return DistanceStrategy.MAX_INNER_PRODUCT
+    # Bancos planos antigos (FAISS.from_documents, ex.: migrate_to_faiss.py) usam L2
+    return DistanceStrategy.EUCLIDEAN_DISTANCE
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """
+    Envolve um modelo de embeddings com cache LRU para as queries.
+    
+    Perguntas repetidas não passam de novo pelo modelo; os documentos
+    são sempre delegados diretamente ao modelo original.
+    """
+    
+    def __init__(self, base: Embeddings, maxsize: int = 4096):
+        self.base = base
+        self._embed_query_cached = lru_cache(maxsize=maxsize)(
+            lambda text: tuple(base.embed_query(text))
+        )
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.base.embed_documents(texts)
+    
+    def embed_query(self, text: str) -> List[float]:
+        return list(self._embed_query_cached(text))
+    
+    def embed_documents_array(self, texts: List[str]) -> np.ndarray:
+        """
+        Codifica os textos numa única chamada, devolvendo direto a matriz float32.
+        
+        Evita a ida e volta por listas de floats Python quando o modelo base
+        é um SentenceTransformer (HuggingFaceEmbeddings).
+        """
+        client = getattr(self.base, 'client', None)
+        if client is None or not hasattr(client, 'encode'):
+            return np.asarray(self.base.embed_documents(texts), dtype=np.float32)
+        
+        # Mesmo pré-processamento de HuggingFaceEmbeddings.embed_documents
+        texts = [text.replace("\n", " ") for text in texts]
+        vectors = client.encode(texts, convert_to_numpy=True, show_progress_bar=False,
+                                **getattr(self.base, 'encode_kwargs', {}))
+        return vectors.astype(np.float32, copy=False)
+
 
 class VectorSearchTool:
     """
@@ -45,9 +178,11 @@ class VectorSearchTool:
         documents_dir: str = "data/processed",
         vectorstore_dir: str = "vectorstore",
         embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2",
-        chunk_size: int = 1000,
-        chunk_overlap: int = 200,
-        force_rebuild: bool = False
+        chunk_size: int = 256,
+        chunk_overlap: int = 32,
+        force_rebuild: bool = False,
+        use_quantization: bool = False,
+        reranker_model: Optional[str] = None
     ):
         """
         Inicializa a ferramenta de busca vetorial.
@@ -56,30 +191,41 @@ class VectorSearchTool:
             documents_dir: Diretório contendo os documentos de texto
             vectorstore_dir: Diretório para armazenar o banco vetorial
             embedding_model: Modelo de embeddings a usar
-            chunk_size: Tamanho máximo de cada chunk em caracteres
-            chunk_overlap: Sobreposição entre chunks consecutivos
+            chunk_size: Tamanho máximo de cada chunk em tokens do modelo de embeddings
+            chunk_overlap: Sobreposição entre chunks consecutivos (em tokens)
             force_rebuild: Se True, reconstrói o banco vetorial mesmo se já existir
+            use_quantization: Se True, armazena os vetores do índice em int8 (4x menos memória)
+            reranker_model: Cross-Encoder para reordenar os candidatos
+                (ex.: "cross-encoder/ms-marco-MiniLM-L-6-v2"); None desativa o re-ranking
         """
         self.documents_dir = Path(documents_dir)
         self.vectorstore_dir = Path(vectorstore_dir)
         self.embedding_model_name = embedding_model
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.use_quantization = use_quantization
         
         # Cria diretórios se não existirem
         self.vectorstore_dir.mkdir(parents=True, exist_ok=True)
         
         # Inicializa o modelo de embeddings
         logger.info(f"Inicializando modelo de embeddings: {embedding_model}")
-        self.embeddings = HuggingFaceEmbeddings(
+        self.embeddings = CachedQueryEmbeddings(HuggingFaceEmbeddings(
             model_name=embedding_model,
             model_kwargs={'device': 'cpu'},
-            encode_kwargs={'normalize_embeddings': True}
-        )
+            # Lotes maiores aproveitam melhor as instruções vetoriais da CPU
+            encode_kwargs={'normalize_embeddings': True, 'batch_size': EMBEDDING_BATCH_SIZE}
+        ))
         
         # Carrega ou cria o banco vetorial
         self.vectorstore = self._load_or_create_vectorstore(force_rebuild)
         
+        # Carrega o Cross-Encoder uma única vez, se configurado
+        self.reranker = None
+        if reranker_model:
+            logger.info(f"Carregando Cross-Encoder para re-ranking: {reranker_model}")
+            self.reranker = CrossEncoder(reranker_model, device='cpu')
+        
         logger.info("VectorSearchTool inicializada com sucesso")
     
     def _load_documents(self) -> List[Document]:
@@ -108,25 +254,33 @@ class VectorSearchTool:
             logger.error(f"Erro ao carregar documentos: {e}")
             return []
     
-    def _deduplicate_documents(self, documents: List[Document]) -> List[Document]:
+    def _deduplicate_documents(
+        self,
+        documents: List[Document],
+        known_hashes: Optional[set] = None
+    ) -> List[Document]:
         """
         Remove documentos duplicados baseado no hash do conteúdo.
         
+        O hash fica registrado em metadata['content_hash'] de cada documento.
+        
         Args:
             documents: Lista de documentos originais
+            known_hashes: Hashes de documentos já indexados (também contam como duplicata)
             
         Returns:
             Lista de documentos únicos
         """
         logger.info("Iniciando deduplicação de documentos...")
         
-        seen_hashes = set()
+        seen_hashes = set(known_hashes or ())
         unique_documents = []
         duplicates_count = 0
         
-        for doc in documents:
+        for doc in tqdm(documents, desc="Deduplicando documentos", mininterval=PROGRESS_MIN_INTERVAL):
             # Cria hash do conteúdo do documento
             content_hash = hashlib.md5(doc.page_content.encode()).hexdigest()
+            doc.metadata['content_hash'] = content_hash
             
             if content_hash not in seen_hashes:
                 seen_hashes.add(content_hash)
@@ -151,54 +305,83 @@ class VectorSearchTool:
         """
         logger.info("Iniciando chunking inteligente de documentos...")
         
-        # Configura o splitter com hierarquia de separadores
-        # Prioriza quebras por: parágrafos duplos > parágrafo único > linha > ponto > espaço
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.chunk_size,
-            chunk_overlap=self.chunk_overlap,
-            length_function=len,
-            separators=[
-                "\n\n\n",  # Múltiplas quebras (seções)
-                "\n\n",    # Parágrafos
-                "\n",      # Linhas
-                ". ",      # Sentenças
-                "! ",      # Exclamações
-                "? ",      # Perguntas
-                "; ",      # Ponto e vírgula
-                ", ",      # Vírgulas
-                " ",       # Espaços
-                ""         # Caracteres individuais (último recurso)
-            ]
-        )
+        # Divide os documentos em paralelo (um splitter por processo);
+        # para poucos documentos, roda no próprio processo
+        splitter_args = (self.chunk_size, self.chunk_overlap, self.embedding_model_name)
+        # O splitter local também mede (em tokens) os chunks fundidos abaixo
+        text_splitter, tokenizer = _build_text_splitter(*splitter_args)
+        executor = None
+        if len(documents) >= PARALLEL_CHUNKING_MIN_DOCUMENTS:
+            executor = ProcessPoolExecutor(initializer=_init_chunking_worker, initargs=splitter_args)
+            split_results = executor.map(_split_document, documents, chunksize=16)
+        else:
+            split_results = (text_splitter.split_documents([doc]) for doc in documents)
+        
+        def fits(text: str) -> bool:
+            return len(tokenizer.encode(text)) <= self.chunk_size
         
-        # Processa cada documento
         all_chunks = []
-        for doc in tqdm(documents, desc="Dividindo documentos em chunks"):
-            chunks = text_splitter.split_documents([doc])
-            
-            # Adiciona metadados úteis a cada chunk
-            for i, chunk in enumerate(chunks):
-                chunk.metadata.update({
-                    'chunk_index': i,
-                    'total_chunks': len(chunks),
-                    'source_file': doc.metadata.get('source', 'unknown')
-                })
-            
-            all_chunks.extend(chunks)
+        merged_count = 0
+        dropped_count = 0
+        try:
+            # Processa cada documento
+            for doc, chunks in tqdm(zip(documents, split_results), total=len(documents),
+                                    desc="Dividindo documentos em chunks",
+                                    mininterval=PROGRESS_MIN_INTERVAL):
+                # Chunks muito pequenos (cabeçalhos de seção, pontuação solta) são
+                # fundidos ao vizinho antes do embedding em vez de descartados depois,
+                # desde que o resultado ainda caiba no limite de tokens do modelo;
+                # senão o chunk pequeno é descartado
+                kept = []
+                pending = ""
+                pending_count = 0
+                for chunk in chunks:
+                    if len(chunk.page_content.strip()) <= MIN_CHUNK_CHARS:
+                        if kept and fits(kept[-1].page_content + "\n" + chunk.page_content):
+                            kept[-1].page_content += "\n" + chunk.page_content
+                            merged_count += 1
+                        elif not kept and fits(pending + chunk.page_content):
+                            pending += chunk.page_content + "\n"
+                            pending_count += 1
+                        else:
+                            dropped_count += 1
+                        continue
+                    if pending:
+                        if fits(pending + chunk.page_content):
+                            chunk.page_content = pending + chunk.page_content
+                            merged_count += pending_count
+                        else:
+                            dropped_count += pending_count
+                        pending = ""
+                        pending_count = 0
+                    kept.append(chunk)
+                
+                # Documento inteiro menor que o mínimo: nada para indexar
+                if not kept:
+                    dropped_count += pending_count
+                    continue
+                
+                # Adiciona metadados úteis a cada chunk
+                for i, chunk in enumerate(kept):
+                    chunk.metadata.update({
+                        'chunk_index': i,
+                        'total_chunks': len(kept),
+                        'source_file': doc.metadata.get('source', 'unknown')
+                    })
+                
+                all_chunks.extend(kept)
+        finally:
+            if executor is not None:
+                executor.shutdown()
         
         logger.info(f"Criados {len(all_chunks)} chunks a partir de {len(documents)} documentos")
         
-        # Remove chunks muito pequenos (provavelmente só têm pontuação ou espaços)
-        filtered_chunks = [
-            chunk for chunk in all_chunks 
-            if len(chunk.page_content.strip()) > 50
-        ]
+        if merged_count:
+            logger.info(f"Fundidos {merged_count} chunks muito pequenos aos vizinhos")
+        if dropped_count:
+            logger.info(f"Removidos {dropped_count} chunks muito pequenos")
         
-        if len(filtered_chunks) < len(all_chunks):
-            removed = len(all_chunks) - len(filtered_chunks)
-            logger.info(f"Removidos {removed} chunks muito pequenos")
-        
-        return filtered_chunks
+        return all_chunks
     
     def _deduplicate_chunks(self, chunks: List[Document]) -> List[Document]:
         """
@@ -215,22 +398,38 @@ class VectorSearchTool:
         seen_contents = set()
         unique_chunks = []
         duplicates_count = 0
+        near_duplicates_count = 0
+        
+        # Índice LSH para detectar quase-duplicatas (cabeçalhos, rodapés, variações de pontuação)
+        lsh = MinHashLSH(threshold=NEAR_DUPLICATE_THRESHOLD, num_perm=MINHASH_NUM_PERM)
         
-        for chunk in chunks:
+        for i, chunk in enumerate(tqdm(chunks, desc="Deduplicando chunks", mininterval=PROGRESS_MIN_INTERVAL)):
             # Normaliza o conteúdo para comparação
             # Remove espaços extras e converte para minúsculas
-            normalized_content = ' '.join(chunk.page_content.lower().split())
+            normalized_content = _WHITESPACE.sub(' ', chunk.page_content.lower()).strip()
             
-            # Cria hash do conteúdo normalizado
-            content_hash = hashlib.md5(normalized_content.encode()).hexdigest()
+            # Hash curto do conteúdo normalizado (só para deduplicação, não criptográfico)
+            content_hash = hashlib.blake2b(normalized_content.encode(), digest_size=8).digest()
             
-            if content_hash not in seen_contents:
-                seen_contents.add(content_hash)
-                unique_chunks.append(chunk)
-            else:
+            if content_hash in seen_contents:
                 duplicates_count += 1
+                continue
+            seen_contents.add(content_hash)
+            
+            # Assinatura MinHash dos 3-gramas de palavras
+            words = normalized_content.split(' ')
+            shingles = {' '.join(words[j:j + 3]) for j in range(max(1, len(words) - 2))}
+            minhash = MinHash(num_perm=MINHASH_NUM_PERM)
+            minhash.update_batch([shingle.encode() for shingle in shingles])
+            
+            if lsh.query(minhash):
+                near_duplicates_count += 1
+                continue
+            lsh.insert(str(i), minhash)
+            unique_chunks.append(chunk)
         
         logger.info(f"Removidos {duplicates_count} chunks duplicados")
+        logger.info(f"Removidos {near_duplicates_count} chunks quase duplicados")
         logger.info(f"Chunks únicos finais: {len(unique_chunks)}")
         
         return unique_chunks
@@ -245,24 +444,43 @@ class VectorSearchTool:
         Returns:
             Banco vetorial FAISS
         """
-        logger.info("Criando banco vetorial FAISS...")
+        logger.info("Criando banco vetorial FAISS (HNSW)...")
+        
+        # Gera todos os embeddings numa única matriz float32
+        vectors = self.embeddings.embed_documents_array([chunk.page_content for chunk in chunks])
         
-        # Cria o banco vetorial com barra de progresso
-        vectorstore = FAISS.from_documents(
-            documents=chunks,
-            embedding=self.embeddings
+        # Embeddings normalizados + produto interno = similaridade de cosseno
+        if self.use_quantization:
+            # Vetores quantizados em 8 bits; o quantizador aprende os intervalos por dimensão
+            index = faiss.IndexHNSWSQ(vectors.shape[1], faiss.ScalarQuantizer.QT_8bit,
+                                      HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            index.train(vectors)
+        else:
+            index = faiss.IndexHNSWFlat(vectors.shape[1], HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        index.add(vectors)
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+        
+        ids = [str(uuid.uuid4()) for _ in chunks]
+        vectorstore = FAISS(
+            self.embeddings,
+            index,
+            InMemoryDocstore(dict(zip(ids, chunks))),
+            dict(enumerate(ids)),
+            distance_strategy=DistanceStrategy.MAX_INNER_PRODUCT
         )
         
         logger.info(f"Banco vetorial criado com {len(chunks)} documentos")
         
         return vectorstore
     
-    def _save_vectorstore(self, vectorstore: FAISS):
+    def _save_vectorstore(self, vectorstore: FAISS, manifest: Dict[str, Dict]):
         """
         Salva o banco vetorial no disco para uso futuro.
         
         Args:
             vectorstore: Banco vetorial a salvar
+            manifest: Estado dos arquivos de origem indexados (ver _build_manifest)
         """
         logger.info(f"Salvando banco vetorial em: {self.vectorstore_dir}")
         
@@ -274,15 +492,128 @@ class VectorSearchTool:
             'embedding_model': self.embedding_model_name,
             'chunk_size': self.chunk_size,
             'chunk_overlap': self.chunk_overlap,
+            'use_quantization': self.use_quantization,
             'total_chunks': len(vectorstore.docstore._dict)
         }
         
-        metadata_path = self.vectorstore_dir / "metadata.pkl"
-        with open(metadata_path, 'wb') as f:
-            pickle.dump(metadata, f)
+        metadata_path = self.vectorstore_dir / "metadata.json"
+        with open(metadata_path, 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, indent=2)
+        
+        self._save_manifest(manifest)
         
         logger.info("Banco vetorial salvo com sucesso")
     
+    def _build_manifest(self, documents: List[Document]) -> Dict[str, Dict]:
+        """
+        Registra mtime, tamanho e hash de conteúdo de cada arquivo carregado.
+        
+        Args:
+            documents: Documentos já passados por _deduplicate_documents
+            
+        Returns:
+            Dicionário caminho -> {'mtime', 'size', 'hash'}
+        """
+        manifest = {}
+        for doc in documents:
+            source = doc.metadata.get('source')
+            if not source:
+                continue
+            stat = Path(source).stat()
+            manifest[source] = {
+                'mtime': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'hash': doc.metadata['content_hash']
+            }
+        return manifest
+    
+    def _save_manifest(self, manifest: Dict[str, Dict]):
+        with open(self.vectorstore_dir / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+    
+    def _load_manifest(self) -> Optional[Dict[str, Dict]]:
+        manifest_path = self.vectorstore_dir / MANIFEST_FILE
+        if not manifest_path.exists():
+            return None
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def _update_vectorstore(self, vectorstore: FAISS) -> Optional[FAISS]:
+        """
+        Sincroniza um banco vetorial carregado com os arquivos atuais.
+        
+        Arquivos com mtime e tamanho inalterados não são abertos nem re-hasheados;
+        arquivos novos são indexados de forma incremental.
+        
+        Args:
+            vectorstore: Banco vetorial carregado do disco
+            
+        Returns:
+            Banco vetorial atualizado, ou None se for preciso reconstruir
+            (arquivos removidos ou com conteúdo alterado)
+        """
+        manifest = self._load_manifest()
+        if manifest is None:
+            # Banco salvo antes do manifesto: mantém o comportamento anterior
+            return vectorstore
+        
+        current_files = {str(path): path.stat() for path in self.documents_dir.glob("**/*.txt")}
+        
+        if any(source not in current_files for source in manifest):
+            return None
+        
+        manifest_changed = False
+        new_files = []
+        for source, stat in current_files.items():
+            entry = manifest.get(source)
+            if entry is None:
+                new_files.append(source)
+                continue
+            if entry['mtime'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+                continue
+            
+            # Arquivo tocado: só reconstrói se o conteúdo realmente mudou
+            content = Path(source).read_text(encoding='utf-8')
+            if hashlib.md5(content.encode()).hexdigest() != entry['hash']:
+                return None
+            entry['mtime'] = stat.st_mtime_ns
+            entry['size'] = stat.st_size
+            manifest_changed = True
+        
+        if not new_files:
+            if manifest_changed:
+                self._save_manifest(manifest)
+            logger.info("Banco vetorial em dia com os documentos")
+            return vectorstore
+        
+        logger.info(f"Indexando {len(new_files)} novos arquivos de forma incremental...")
+        
+        documents = []
+        for source in new_files:
+            documents.extend(TextLoader(source, encoding='utf-8').load())
+        
+        known_hashes = {entry['hash'] for entry in manifest.values()}
+        unique_documents = self._deduplicate_documents(documents, known_hashes)
+        manifest.update(self._build_manifest(documents))
+        
+        chunks = self._deduplicate_chunks(self._smart_chunk_documents(unique_documents))
+        if chunks:
+            vectors = self.embeddings.embed_documents_array([chunk.page_content for chunk in chunks])
+            
+            start = vectorstore.index.ntotal
+            vectorstore.index.add(vectors)
+            
+            ids = [str(uuid.uuid4()) for _ in chunks]
+            vectorstore.docstore.add(dict(zip(ids, chunks)))
+            vectorstore.index_to_docstore_id.update(
+                {start + offset: doc_id for offset, doc_id in enumerate(ids)}
+            )
+            self._tune_search(vectorstore, HNSW_EF_SEARCH)
+        
+        self._save_vectorstore(vectorstore, manifest)
+        
+        return vectorstore
+    
     def _load_vectorstore(self) -> Optional[FAISS]:
         """
         Carrega um banco vetorial existente do disco.
@@ -303,12 +634,14 @@ class VectorSearchTool:
                 str(self.vectorstore_dir),
                 self.embeddings
             )
+            vectorstore.distance_strategy = _distance_strategy_for(vectorstore.index)
+            self._tune_search(vectorstore, HNSW_EF_SEARCH)
             
             # Carrega metadados
-            metadata_path = self.vectorstore_dir / "metadata.pkl"
+            metadata_path = self.vectorstore_dir / "metadata.json"
             if metadata_path.exists():
-                with open(metadata_path, 'rb') as f:
-                    metadata = pickle.load(f)
+                with open(metadata_path, 'r', encoding='utf-8') as f:
+                    metadata = json.load(f)
                 logger.info(f"Banco vetorial carregado: {metadata['total_chunks']} chunks")
             
             return vectorstore
@@ -331,7 +664,10 @@ class VectorSearchTool:
         if not force_rebuild:
             vectorstore = self._load_vectorstore()
             if vectorstore is not None:
-                return vectorstore
+                vectorstore = self._update_vectorstore(vectorstore)
+                if vectorstore is not None:
+                    return vectorstore
+                logger.info("Documentos alterados ou removidos desde a última indexação")
         
         # Cria novo banco vetorial
         logger.info("Construindo novo banco vetorial...")
@@ -342,7 +678,8 @@ class VectorSearchTool:
             raise ValueError("Nenhum documento encontrado para processar")
         
         # Deduplicação em nível de documento
-        documents = self._deduplicate_documents(documents)
+        all_documents = documents
+        documents = self._deduplicate_documents(all_documents)
         
         # Chunking inteligente
         chunks = self._smart_chunk_documents(documents)
@@ -353,11 +690,53 @@ class VectorSearchTool:
         # Criação do banco vetorial
         vectorstore = self._create_vectorstore(chunks)
         
-        # Salva para uso futuro
-        self._save_vectorstore(vectorstore)
+        # Salva para uso futuro (com o manifesto dos arquivos para reindexação incremental)
+        self._save_vectorstore(vectorstore, self._build_manifest(all_documents))
         
         return vectorstore
     
+    def _tune_search(self, vectorstore: FAISS, fetch_k: int):
+        """
+        Ajusta o efSearch do HNSW para a quantidade de candidatos pedida.
+        
+        Args:
+            vectorstore: Banco vetorial em uso
+            fetch_k: Número de candidatos da busca
+        """
+        # Índices planos antigos (antes do HNSW) não têm esse parâmetro
+        if hasattr(vectorstore.index, 'hnsw'):
+            vectorstore.index.hnsw.efSearch = max(HNSW_EF_SEARCH, fetch_k * 2)
+    
+    def _rerank(
+        self,
+        query: str,
+        results: List[Tuple[Document, float]],
+        k: int
+    ) -> List[Tuple[Document, float]]:
+        """
+        Reordena os candidatos da busca vetorial com o Cross-Encoder.
+        
+        Todos os pares (query, candidato) passam numa única chamada em lote
+        ao modelo, em vez de uma predição por par.
+        
+        Args:
+            query: Pergunta do usuário
+            results: Candidatos (documento, score) da busca vetorial
+            k: Número de resultados a manter
+            
+        Returns:
+            Os k melhores candidatos, com o score do Cross-Encoder
+            (ou os k primeiros da busca vetorial, sem re-ranking)
+        """
+        if self.reranker is None or not results:
+            return results[:k]
+        
+        pairs = [(query, doc.page_content) for doc, _ in results]
+        scores = self.reranker.predict(pairs, batch_size=len(pairs), show_progress_bar=False)
+        
+        order = np.argsort(-scores)[:k]
+        return [(results[i][0], float(scores[i])) for i in order]
+    
     def search(
         self,
         query: str,
@@ -371,7 +750,7 @@ class VectorSearchTool:
         Args:
             query: Pergunta ou consulta do usuário
             k: Número de resultados finais a retornar
-            fetch_k: Número de candidatos iniciais para buscar (para re-ranking futuro)
+            fetch_k: Número de candidatos iniciais para buscar (entrada do re-ranking)
             filter_dict: Filtros opcionais para aplicar na busca
             
         Returns:
@@ -380,20 +759,17 @@ class VectorSearchTool:
         logger.info(f"Realizando busca: '{query}'")
         
         try:
-            # Busca inicial com mais candidatos para permitir re-ranking futuro
+            self._tune_search(self.vectorstore, fetch_k)
+            
+            # Busca inicial com mais candidatos para o re-ranking
             results = self.vectorstore.similarity_search_with_score(
                 query=query,
                 k=fetch_k,
                 filter=filter_dict
             )
             
-            # TODO: Implementar um Cross-Encoder para re-ranking dos resultados aqui
-            # O Cross-Encoder receberia a query e cada documento candidato,
-            # calcularia um score mais preciso e reordenaria os resultados.
-            # Por enquanto, usamos apenas os top-k resultados da busca vetorial.
-            
-            # Extrai apenas os top-k resultados
-            top_results = results[:k]
+            # Reordena os candidatos com o Cross-Encoder (se configurado) e fica com os top-k
+            top_results = self._rerank(query, results, k)
             
             # Log dos scores para debug
             for i, (doc, score) in enumerate(top_results):
@@ -435,15 +811,14 @@ class VectorSearchTool:
         logger.info(f"Realizando busca com metadados: '{query}'")
         
         try:
+            self._tune_search(self.vectorstore, fetch_k)
             results = self.vectorstore.similarity_search_with_score(
                 query=query,
                 k=fetch_k,
                 filter=filter_dict
             )
             
-            # TODO: Cross-Encoder para re-ranking aqui
-            
-            top_results = results[:k]
+            top_results = self._rerank(query, results, k)
             
             # Prepara resultados com todas as informações
             detailed_results = [
@@ -456,6 +831,44 @@ class VectorSearchTool:
         except Exception as e:
             logger.error(f"Erro durante a busca: {e}")
             return []
+    
+    def search_batch(self, queries: List[str], k: int = 5) -> List[List[str]]:
+        """
+        Realiza várias buscas vetoriais de uma vez.
+        
+        As queries são codificadas numa única passada do modelo e buscadas
+        no índice com uma só chamada FAISS sobre a matriz (B, dim) float32.
+        
+        Args:
+            queries: Lista de perguntas
+            k: Número de resultados por pergunta
+            
+        Returns:
+            Lista com o conteúdo dos k chunks mais relevantes de cada pergunta
+        """
+        logger.info(f"Realizando lote de {len(queries)} buscas")
+        
+        if not queries:
+            return []
+        
+        try:
+            query_matrix = self.embeddings.embed_documents_array(queries)
+            
+            self._tune_search(self.vectorstore, k)
+            _, indices = self.vectorstore.index.search(query_matrix, k)
+            
+            docstore = self.vectorstore.docstore
+            index_to_id = self.vectorstore.index_to_docstore_id
+            
+            # FAISS preenche com -1 quando há menos de k resultados
+            return [
+                [docstore.search(index_to_id[i]).page_content for i in row if i != -1]
+                for row in indices
+            ]
+            
+        except Exception as e:
+            logger.error(f"Erro durante a busca em lote: {e}")
+            return [[] for _ in queries]
 
 
 # Instância global para compatibilidade com a interface anterior
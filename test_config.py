@@ -4,10 +4,106 @@ Script para testar a configuração antes de processar arquivos.
 
 import os
 import sys
+import json
+import asyncio
+import argparse
+import importlib.util
+import time
+import hashlib
 from pathlib import Path
 
-def test_config():
-    """Testa se a configuração está correta."""
+# Cache do teste de conectividade da OpenAI (evita um handshake TLS a cada execução)
+OPENAI_PROBE_CACHE = Path.home() / ".cache" / "ufcspa-rag" / "openai_probe.json"
+OPENAI_PROBE_TTL = 600  # segundos
+
+
+def probe_openai(api_key: str) -> int:
+    """
+    Consulta GET /v1/models e devolve o status HTTP.
+    
+    Sucessos ficam em cache por OPENAI_PROBE_TTL segundos, por chave de API.
+    """
+    key_hash = hashlib.sha256(api_key.encode()).hexdigest()
+    try:
+        cached = json.loads(OPENAI_PROBE_CACHE.read_text())
+        if cached.get("key") == key_hash and time.time() - cached.get("ts", 0) < OPENAI_PROBE_TTL:
+            return cached["status"]
+    except (OSError, ValueError):
+        pass
+    
+    import requests
+    response = requests.get(
+        "https://api.openai.com/v1/models",
+        headers={"Authorization": f"Bearer {api_key}"},
+        timeout=5
+    )
+    
+    # Só guarda o resultado positivo: falhas são sempre testadas de novo
+    if response.status_code == 200:
+        try:
+            OPENAI_PROBE_CACHE.parent.mkdir(parents=True, exist_ok=True)
+            OPENAI_PROBE_CACHE.write_text(json.dumps({"key": key_hash, "ts": time.time(), "status": 200}))
+        except OSError:
+            pass
+    return response.status_code
+
+def is_installed(module: str) -> bool:
+    """Verifica se o pacote está instalado sem importá-lo."""
+    return importlib.util.find_spec(module) is not None
+
+
+def probe_pinecone(api_key: str, index_name: str) -> int:
+    """
+    Abre o índice e devolve o total de vetores.
+    
+    Tudo aqui bloqueia (import, resolução do host do índice e estatísticas),
+    por isso roda fora do event loop.
+    """
+    from pinecone import Pinecone
+    pc = Pinecone(api_key=api_key)
+    index = pc.Index(index_name)
+    stats = index.describe_index_stats()
+    return stats.get('total_vector_count', 0)
+
+
+async def check_pinecone(config) -> list[str]:
+    """Testa a conexão com o índice Pinecone."""
+    try:
+        vector_count = await asyncio.to_thread(
+            probe_pinecone, config.PINECONE_API_KEY, config.PINECONE_INDEX_NAME
+        )
+        return [f"✅ Conectado ao Pinecone! Vetores no índice: {vector_count}"]
+    except Exception as e:
+        return [
+            f"⚠️  Erro ao conectar ao Pinecone: {e}",
+            "   Verifique se o índice existe e o nome está correto"
+        ]
+
+
+async def check_openai(config) -> list[str]:
+    """Testa a API da OpenAI."""
+    try:
+        status_code = await asyncio.to_thread(probe_openai, config.OPENAI_API_KEY)
+        if status_code == 200:
+            return ["✅ OpenAI API funcionando!"]
+        return [f"⚠️  OpenAI API retornou status: {status_code}"]
+    except Exception as e:
+        return [f"❌ Erro ao testar OpenAI: {e}"]
+
+
+async def run_probes(probes):
+    """Executa os testes de conexão ao mesmo tempo, mostrando cada um ao terminar."""
+    for finished in asyncio.as_completed(probes):
+        for line in await finished:
+            print(line)
+
+
+def test_config(offline: bool = False):
+    """
+    Testa se a configuração está correta.
+    
+    Com offline=True, só verifica variáveis e pacotes (sem chamadas de rede).
+    """
     print("🔍 TESTE DE CONFIGURAÇÃO")
     print("=" * 50)
     
@@ -47,66 +143,47 @@ def test_config():
     # Testa imports
     print("\n📦 Testando dependências...")
     
-    try:
-        import requests
-        print("✅ requests instalado")
-    except:
-        print("❌ requests não instalado")
-        all_ok = False
+    # Só localiza os pacotes; os imports pesados ficam para quando forem usados
+    packages = {
+        "requests": "requests",
+        "pinecone": "pinecone-client",
+        "dotenv": "python-dotenv",
+        "tqdm": "tqdm"
+    }
+    for module, package in packages.items():
+        if is_installed(module):
+            print(f"✅ {package} instalado")
+        else:
+            print(f"❌ {package} não instalado")
+            all_ok = False
     
-    try:
-        from pinecone import Pinecone
-        print("✅ pinecone-client instalado")
-        
-        # Testa conexão Pinecone
-        if config.PINECONE_API_KEY:
-            try:
-                pc = Pinecone(api_key=config.PINECONE_API_KEY)
-                index = pc.Index(config.PINECONE_INDEX_NAME)
-                stats = index.describe_index_stats()
-                print(f"✅ Conectado ao Pinecone! Vetores no índice: {stats.get('total_vector_count', 0)}")
-            except Exception as e:
-                print(f"⚠️  Erro ao conectar ao Pinecone: {e}")
-                print("   Verifique se o índice existe e o nome está correto")
-    except:
-        print("❌ pinecone-client não instalado")
-        all_ok = False
+    if offline:
+        print("\n⏭️  Modo offline: testes de conexão ignorados")
+        return all_ok
     
-    try:
-        from dotenv import load_dotenv
-        print("✅ python-dotenv instalado")
-    except:
-        print("❌ python-dotenv não instalado")
-        all_ok = False
+    # Testa Pinecone e OpenAI em paralelo: o tempo total é o da conexão mais lenta
+    probes = []
+    if config.PINECONE_API_KEY and is_installed("pinecone"):
+        probes.append(check_pinecone(config))
+    if config.OPENAI_API_KEY and is_installed("requests"):
+        probes.append(check_openai(config))
     
-    try:
-        from tqdm import tqdm
-        print("✅ tqdm instalado")
-    except:
-        print("❌ tqdm não instalado")
-        all_ok = False
-    
-    # Testa OpenAI
-    if config.OPENAI_API_KEY:
-        print("\n🧪 Testando OpenAI API...")
-        try:
-            import requests
-            response = requests.post(
-                "https://api.openai.com/v1/models",
-                headers={"Authorization": f"Bearer {config.OPENAI_API_KEY}"},
-                timeout=5
-            )
-            if response.status_code == 200:
-                print("✅ OpenAI API funcionando!")
-            else:
-                print(f"⚠️  OpenAI API retornou status: {response.status_code}")
-        except Exception as e:
-            print(f"❌ Erro ao testar OpenAI: {e}")
+    if probes:
+        print("\n🧪 Testando conexões...")
+        asyncio.run(run_probes(probes))
     
     return all_ok
 
 def main():
-    if test_config():
+    parser = argparse.ArgumentParser(description="Testa a configuração do projeto")
+    parser.add_argument(
+        '--offline',
+        action='store_true',
+        help='Não testa as conexões com Pinecone e OpenAI'
+    )
+    args = parser.parse_args()
+    
+    if test_config(offline=args.offline):
         print("\n✅ CONFIGURAÇÃO OK! Você pode executar:")
         print("   python ingest_final.py --file data/processed/0a1efcf5_Resultado_Consulta__Comunidade_2024_-_Discentes.txt")
     else:
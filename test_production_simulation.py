@@ -8,39 +8,111 @@ Execute este script para simular chamadas reais à ferramenta de busca.
 import json
 import time
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import random
+from pathlib import Path
+
+import orjson
 
 # Importa a ferramenta
-from search_tool import search_vectorstore, VectorSearchTool
+from search_tool import search_vectorstore, search_tool_instance, VectorSearchTool
 
 
 class CrewAISimulator:
     """Simula como o CrewAI chamaria a ferramenta."""
     
-    def __init__(self):
-        self.call_history = []
+    def __init__(self, history_file: str = "logs/simulation_calls.jsonl"):
         self.start_time = time.time()
+        self._lock = threading.Lock()
+        
+        # Histórico gravado em JSONL (append-only); na memória ficam só os contadores
+        history_path = Path(history_file)
+        history_path.parent.mkdir(parents=True, exist_ok=True)
+        self._history = open(history_path, 'ab')
+        self.total_calls = 0
+        self.successful_calls = 0
+        self.timed_calls = 0
+        self.total_duration = 0.0
+        self.successful_results = 0
+        self.total_batches = 0
+        self.total_batch_duration = 0.0
+    
+    def close(self):
+        """Grava o que estiver no buffer e fecha o arquivo de histórico."""
+        self._history.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
         
-    def log_call(self, query: str, results: List[str], duration: float):
-        """Registra uma chamada para análise."""
-        self.call_history.append({
+    def log_call(self, query: str, results: List[str], duration: Optional[float]):
+        """
+        Registra uma chamada para análise (seguro entre threads).
+        
+        duration=None indica chamada resolvida em lote, sem latência individual medida.
+        """
+        entry = {
             'timestamp': datetime.now().isoformat(),
             'query': query,
             'results_count': len(results),
             'duration': duration,
             'success': len(results) > 0
-        })
+        }
+        with self._lock:
+            self._history.write(orjson.dumps(entry) + b'\n')
+            self.total_calls += 1
+            if duration is not None:
+                self.timed_calls += 1
+                self.total_duration += duration
+            if entry['success']:
+                self.successful_calls += 1
+                self.successful_results += entry['results_count']
     
-    def simulate_agent_call(self, query: str, agent_name: str = "Pesquisador"):
-        """Simula uma chamada de um agente CrewAI."""
+    def log_batch(self, size: int, duration: float):
+        """Registra o tempo de relógio de um lote de chamadas."""
+        entry = {
+            'timestamp': datetime.now().isoformat(),
+            'batch_size': size,
+            'duration': duration
+        }
+        with self._lock:
+            self._history.write(orjson.dumps(entry) + b'\n')
+            self.total_batches += 1
+            self.total_batch_duration += duration
+    
+    def _print_header(self, query: str, agent_name: str):
         print(f"\n{'='*60}")
         print(f"🤖 AGENTE: {agent_name}")
         print(f"{'='*60}")
         print(f"📝 Query: {query}")
         print(f"⏰ Timestamp: {datetime.now().strftime('%H:%M:%S')}")
         print("-" * 60)
+    
+    def _print_results(self, results: List[str], duration: Optional[float] = None):
+        if duration is None:
+            print(f"\n✅ Sucesso! {len(results)} resultados")
+        else:
+            print(f"\n✅ Sucesso! {len(results)} resultados em {duration:.2f}s")
+        
+        if results:
+            print("\n📄 RESULTADOS:")
+            for i, text in enumerate(results, 1):
+                print(f"\n[Resultado {i}]")
+                # Mostra primeiros 300 caracteres
+                preview = text[:300] + "..." if len(text) > 300 else text
+                print(preview)
+                print(f"(Total: {len(text)} caracteres)")
+        else:
+            print("\n⚠️  Nenhum resultado encontrado")
+    
+    def simulate_agent_call(self, query: str, agent_name: str = "Pesquisador"):
+        """Simula uma chamada de um agente CrewAI."""
+        self._print_header(query, agent_name)
         
         # Marca tempo
         start = time.time()
@@ -53,18 +125,7 @@ class CrewAISimulator:
             self.log_call(query, results, duration)
             
             # Mostra resultados
-            print(f"\n✅ Sucesso! {len(results)} resultados em {duration:.2f}s")
-            
-            if results:
-                print("\n📄 RESULTADOS:")
-                for i, text in enumerate(results, 1):
-                    print(f"\n[Resultado {i}]")
-                    # Mostra primeiros 300 caracteres
-                    preview = text[:300] + "..." if len(text) > 300 else text
-                    print(preview)
-                    print(f"(Total: {len(text)} caracteres)")
-            else:
-                print("\n⚠️  Nenhum resultado encontrado")
+            self._print_results(results, duration)
                 
             return results
             
@@ -75,27 +136,53 @@ class CrewAISimulator:
             traceback.print_exc()
             return []
     
+    def simulate_batch_calls(self, scenarios: List[Dict[str, str]]) -> List[List[str]]:
+        """
+        Simula chamadas de vários agentes resolvidas num único lote.
+        
+        Os embeddings saem de uma só chamada à API e as queries ao Pinecone
+        rodam em paralelo. Só o tempo do lote inteiro é medido; as chamadas
+        são registradas sem latência individual.
+        """
+        start = time.time()
+        batch_results = search_tool_instance.search_batch([s['query'] for s in scenarios])
+        duration = time.time() - start
+        
+        print(f"\n⚡ Lote de {len(scenarios)} chamadas resolvido em {duration:.2f}s")
+        self.log_batch(len(scenarios), duration)
+        
+        for scenario, results in zip(scenarios, batch_results):
+            self._print_header(scenario['query'], scenario['agent'])
+            self.log_call(scenario['query'], results, None)
+            self._print_results(results)
+        
+        return batch_results
+    
     def show_statistics(self):
         """Mostra estatísticas das chamadas."""
-        if not self.call_history:
+        self._history.flush()
+        if not self.total_calls:
             return
         
         print(f"\n\n{'='*60}")
         print("📊 ESTATÍSTICAS DA SESSÃO")
         print(f"{'='*60}")
         
-        total_calls = len(self.call_history)
-        successful_calls = sum(1 for c in self.call_history if c['success'])
-        total_duration = sum(c['duration'] for c in self.call_history)
-        avg_duration = total_duration / total_calls if total_calls > 0 else 0
+        total_calls = self.total_calls
+        successful_calls = self.successful_calls
         
         print(f"Total de chamadas: {total_calls}")
         print(f"Chamadas bem-sucedidas: {successful_calls} ({successful_calls/total_calls*100:.1f}%)")
-        print(f"Tempo total: {total_duration:.2f}s")
-        print(f"Tempo médio por chamada: {avg_duration:.2f}s")
+        
+        # Latência média só das chamadas medidas individualmente
+        if self.timed_calls:
+            print(f"Tempo total (chamadas individuais): {self.total_duration:.2f}s")
+            print(f"Tempo médio por chamada: {self.total_duration / self.timed_calls:.2f}s")
+        if self.total_batches:
+            print(f"Lotes: {self.total_batches} - tempo total dos lotes: {self.total_batch_duration:.2f}s")
         
         if successful_calls > 0:
-            avg_results = sum(c['results_count'] for c in self.call_history if c['success']) / successful_calls
+            avg_results = self.successful_results / successful_calls
             print(f"Média de resultados por busca: {avg_results:.1f}")
 
 
@@ -104,13 +191,12 @@ def test_basic_functionality():
     print("\n🧪 TESTE 1: Funcionalidade Básica")
     print("-" * 60)
     
-    sim = CrewAISimulator()
-    
-    # Teste simples
-    results = sim.simulate_agent_call(
-        "Quais são as normas de extensão da UFCSPA?",
-        "Agente Teste Básico"
-    )
+    with CrewAISimulator() as sim:
+        # Teste simples
+        results = sim.simulate_agent_call(
+            "Quais são as normas de extensão da UFCSPA?",
+            "Agente Teste Básico"
+        )
     
     return len(results) > 0
 
@@ -120,8 +206,6 @@ def test_production_scenarios():
     print("\n\n🎯 TESTE 2: Cenários de Produção")
     print("=" * 60)
     
-    sim = CrewAISimulator()
-    
     # Cenários que o CrewAI usaria
     production_queries = [
         {
@@ -146,16 +230,12 @@ def test_production_scenarios():
         }
     ]
     
-    # Simula múltiplas chamadas como em produção
-    for scenario in production_queries:
-        results = sim.simulate_agent_call(
-            scenario['query'],
-            scenario['agent']
-        )
-        time.sleep(0.5)  # Simula delay entre chamadas
-    
-    # Mostra estatísticas
-    sim.show_statistics()
+    with CrewAISimulator() as sim:
+        # Simula múltiplas chamadas como em produção (um único lote)
+        sim.simulate_batch_calls(production_queries)
+        
+        # Mostra estatísticas
+        sim.show_statistics()
 
 
 def test_stress_and_edge_cases():
@@ -163,8 +243,6 @@ def test_stress_and_edge_cases():
     print("\n\n⚡ TESTE 3: Stress e Edge Cases")
     print("=" * 60)
     
-    sim = CrewAISimulator()
-    
     edge_cases = [
         # Query vazia
         "",
@@ -182,7 +260,9 @@ def test_stress_and_edge_cases():
     
     print("\n🔥 Testando casos extremos...")
     
-    for query in edge_cases:
+    # Query vazia vai sozinha: a API de embeddings rejeita entrada vazia e
+    # derrubaria o lote inteiro
+    for query in (q for q in edge_cases if not q.strip()):
         print(f"\n{'='*60}")
         print(f"Edge case: {query[:50]}...")
         try:
@@ -192,6 +272,20 @@ def test_stress_and_edge_cases():
             print(f"✅ Tratado com sucesso em {duration:.2f}s - {len(results)} resultados")
         except Exception as e:
             print(f"❌ Erro (esperado?): {type(e).__name__}: {e}")
+    
+    # Demais casos: um lote só (uma chamada de embeddings + queries em paralelo)
+    batch = [q for q in edge_cases if q.strip()]
+    try:
+        start = time.time()
+        batch_results = search_tool_instance.search_batch(batch)
+        duration = time.time() - start
+        for query, results in zip(batch, batch_results):
+            print(f"\n{'='*60}")
+            print(f"Edge case: {query[:50]}...")
+            print(f"✅ Tratado com sucesso - {len(results)} resultados")
+        print(f"\n⏱️  Lote de {len(batch)} casos em {duration:.2f}s")
+    except Exception as e:
+        print(f"❌ Erro (esperado?): {type(e).__name__}: {e}")
 
 
 def test_performance():
@@ -202,32 +296,43 @@ def test_performance():
     query_test = "Normas e regulamentos da UFCSPA"
     iterations = 5
     
-    print(f"Executando {iterations} vezes a mesma query...")
+    print(f"Executando {iterations} vezes a mesma query (em paralelo)...")
     print(f"Query: '{query_test}'")
     print("-" * 60)
     
-    times = []
-    result_counts = []
-    
-    for i in range(iterations):
-        start = time.time()
+    def timed_search(_):
+        start = time.perf_counter()
         results = search_vectorstore(query_test)
-        duration = time.time() - start
-        
-        times.append(duration)
-        result_counts.append(len(results))
-        
-        print(f"Iteração {i+1}: {duration:.3f}s - {len(results)} resultados")
+        return time.perf_counter() - start, len(results)
+    
+    # Aquecimento serial: popula os caches e abre as conexões antes de medir.
+    # Depois dele o embedding da query vem do cache em memória, então as iterações
+    # medem só a busca no Pinecone (com `iterations` buscas concorrentes)
+    search_vectorstore(query_test)
+    print("(cache de embeddings aquecido: tempos abaixo medem só a busca no Pinecone, "
+          f"com {iterations} buscas concorrentes)")
+    
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=iterations) as executor:
+        measurements = list(executor.map(timed_search, range(iterations)))
+    wall_time = time.perf_counter() - wall_start
+    
+    times = [duration for duration, _ in measurements]
+    result_counts = [count for _, count in measurements]
+    
+    for i, (duration, count) in enumerate(measurements):
+        print(f"Iteração {i+1}: {duration:.3f}s - {count} resultados")
     
     # Análise
     avg_time = sum(times) / len(times)
     min_time = min(times)
     max_time = max(times)
     
-    print(f"\n📊 Análise de Performance:")
-    print(f"Tempo médio: {avg_time:.3f}s")
-    print(f"Tempo mínimo: {min_time:.3f}s")
-    print(f"Tempo máximo: {max_time:.3f}s")
+    print(f"\n📊 Análise de Performance (cache quente, só Pinecone, {iterations} concorrentes):")
+    print(f"Tempo total (relógio): {wall_time:.3f}s")
+    print(f"Tempo médio (sem embedding): {avg_time:.3f}s")
+    print(f"Tempo mínimo (sem embedding): {min_time:.3f}s")
+    print(f"Tempo máximo (sem embedding): {max_time:.3f}s")
     print(f"Variação: {max_time - min_time:.3f}s")
     
     # Verifica consistência
@@ -276,30 +381,29 @@ def interactive_test():
     print("Digite suas queries para testar (ou 'sair' para terminar)")
     print("-" * 60)
     
-    sim = CrewAISimulator()
-    
-    while True:
-        try:
-            query = input("\n🔍 Sua query: ").strip()
-            
-            if query.lower() in ['sair', 'exit', 'quit']:
+    with CrewAISimulator() as sim:
+        while True:
+            try:
+                query = input("\n🔍 Sua query: ").strip()
+                
+                if query.lower() in ['sair', 'exit', 'quit']:
+                    break
+                
+                if not query:
+                    print("⚠️  Digite uma query válida")
+                    continue
+                
+                # Simula chamada
+                sim.simulate_agent_call(query, "Usuário Teste")
+                
+            except KeyboardInterrupt:
+                print("\n\n👋 Saindo...")
                 break
-            
-            if not query:
-                print("⚠️  Digite uma query válida")
-                continue
-            
-            # Simula chamada
-            sim.simulate_agent_call(query, "Usuário Teste")
-            
-        except KeyboardInterrupt:
-            print("\n\n👋 Saindo...")
-            break
-        except Exception as e:
-            print(f"❌ Erro: {e}")
-    
-    # Mostra estatísticas finais
-    sim.show_statistics()
+            except Exception as e:
+                print(f"❌ Erro: {e}")
+        
+        # Mostra estatísticas finais
+        sim.show_statistics()
 
 
 def main():
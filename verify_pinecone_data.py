@@ -1,81 +1,200 @@
+import argparse
+import asyncio
+import io
 import logging
-import pprint
-import pinecone
+import sys
+from functools import lru_cache
+import diskcache
+import grpc
+import numpy as np
+import orjson
+from pinecone.exceptions import NotFoundException
+from pinecone.grpc import GRPCClientConfig, PineconeGRPC
 import config
 
 # --- Configuração do Logging ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
-pp = pprint.PrettyPrinter(indent=4)
 
-def verify_pinecone_data():
+# Cache curto das estatísticas: reexecuções seguidas (debug) não repetem as chamadas de rede
+STATS_CACHE_DIR = ".cache/pinecone"
+STATS_CACHE_TTL = 60  # segundos
+
+# Número de direções de busca sondadas. Sem query multi-vetor no cliente gRPC,
+# cada sonda é um RPC próprio; num índice não vazio qualquer vetor unitário já
+# retorna vizinhos, então uma basta
+PROBE_COUNT = 1
+
+# Configuração validada uma única vez, na importação
+_MISSING = [
+    name for name in ("PINECONE_API_KEY", "PINECONE_ENVIRONMENT", "PINECONE_INDEX_NAME")
+    if not getattr(config, name)
+]
+
+
+@lru_cache(maxsize=1)
+def _client() -> PineconeGRPC:
+    """Cliente Pinecone único do módulo (reaproveita o canal gRPC entre chamadas)."""
+    return PineconeGRPC(api_key=config.PINECONE_API_KEY)
+
+
+@lru_cache(maxsize=1)
+def _index(name: str):
+    """Handle do índice reaproveitado entre chamadas, como recomenda o Pinecone."""
+    # gzip por mensagem no canal gRPC. Vale só para as mensagens enviadas pelo cliente
+    # (aqui, vetores float32 aleatórios, que pouco comprimem); não faz o servidor
+    # comprimir as respostas com os metadados
+    grpc_config = GRPCClientConfig(
+        grpc_channel_options={"grpc.default_compression_algorithm": grpc.Compression.Gzip}
+    )
+    return _client().Index(name, grpc_config=grpc_config)
+
+
+def _stats_to_dict(stats) -> dict:
+    """Reduz a resposta de describe_index_stats aos campos usados aqui (serializável)."""
+    return {
+        'total_vector_count': stats.get('total_vector_count', 0),
+        'dimension': stats.get('dimension', config.EMBEDDING_DIMENSION),
+        'namespaces': {
+            name: summary.vector_count
+            for name, summary in (stats.get('namespaces') or {}).items()
+        }
+    }
+
+async def verify_pinecone_data(ping: bool = False, use_cache: bool = True) -> bool:
     """
     Conecta ao Pinecone, exibe as estatísticas do índice e realiza uma
     busca genérica para verificar se o índice contém dados.
+    
+    Com ping=True (health checks/CI) só as estatísticas são consultadas,
+    sem a busca, e sempre direto no Pinecone (o cache de estatísticas é
+    ignorado, como em use_cache=False).
+    
+    Retorna True se o índice existe, tem vetores e (fora do ping) a busca
+    encontrou dados; False em qualquer falha.
     """
     logger.info("--- INICIANDO FERRAMENTA DE VERIFICAÇÃO ROBUSTA ---")
     
-    if not all([config.PINECONE_API_KEY, config.PINECONE_ENVIRONMENT, config.PINECONE_INDEX_NAME]):
-        logger.critical("ERRO: Verifique as chaves de API do Pinecone no seu arquivo .env!")
-        return
+    if _MISSING:
+        logger.critical("ERRO: Verifique as chaves de API do Pinecone no seu arquivo .env! Faltando: %s", ", ".join(_MISSING))
+        return False
 
+    stats_cache = diskcache.Cache(STATS_CACHE_DIR)
+    cache_key = (config.PINECONE_INDEX_NAME, "stats")
+    
     try:
-        # 1. Conecta ao Pinecone
-        pc = pinecone.Pinecone(api_key=config.PINECONE_API_KEY)
-        
-        # Verifica se o índice existe antes de tentar conectar
-        if config.PINECONE_INDEX_NAME not in pc.list_indexes().names():
-            logger.error(f"O índice '{config.PINECONE_INDEX_NAME}' não foi encontrado na sua conta Pinecone.")
-            logger.error("Verifique se o nome no seu arquivo .env está correto e se o script de ingestão já foi executado.")
-            return
+        index = None
+        # Um ping precisa falar com o serviço: nunca responde a partir do cache
+        stats = stats_cache.get(cache_key) if use_cache and not ping else None
+        if stats is not None:
+            logger.info("Usando estatísticas em cache (até %ds).", STATS_CACHE_TTL)
+        else:
+            def open_index():
+                index = _index(config.PINECONE_INDEX_NAME)
+                return index, index.describe_index_stats()
+            
+            # 1. Conecta ao Pinecone (transporte gRPC: menos overhead por chamada, HTTP/2 multiplexado).
+            # Um índice inexistente já falha aqui, sem precisar listar os índices da conta antes.
+            try:
+                opened = await asyncio.to_thread(open_index)
+            except NotFoundException:
+                logger.error("O índice '%s' não foi encontrado na sua conta Pinecone.", config.PINECONE_INDEX_NAME)
+                logger.error("Verifique se o nome no seu arquivo .env está correto e se o script de ingestão já foi executado.")
+                return False
             
-        index = pc.Index(config.PINECONE_INDEX_NAME)
-        logger.info(f"Conectado com sucesso ao índice '{config.PINECONE_INDEX_NAME}'.")
+            logger.info("Conectado com sucesso ao índice '%s'.", config.PINECONE_INDEX_NAME)
 
-        # 2. Mostra as Estatísticas do Índice (A Pista Mais Importante)
-        stats = index.describe_index_stats()
+            # 2. Mostra as Estatísticas do Índice (A Pista Mais Importante)
+            index, raw_stats = opened
+            
+            stats = _stats_to_dict(raw_stats)
+            stats_cache.set(cache_key, stats, expire=STATS_CACHE_TTL)
+        
         vector_count = stats.get('total_vector_count', 0)
         
         print("\n" + "="*50)
         print("Estatísticas do Índice no Pinecone:")
         print(f"  - Total de Vetores no Índice: {vector_count}")
+        for name, count in sorted(stats['namespaces'].items(), key=lambda item: -item[1]):
+            print(f"  - Namespace '{name or '(padrão)'}': {count} vetores")
         print("="*50 + "\n")
 
+        if ping and vector_count > 0:
+            logger.info("✅ PING OK: o índice existe e contém vetores.")
+            return True
+        
         # 3. Realiza uma busca genérica para ver se retorna QUALQUER COISA
         if vector_count > 0:
             logger.info("Realizando uma busca genérica para confirmar que o índice está populado...")
             
-            # Cria um vetor de busca "aleatório" do tamanho correto
-            # para ver quais são os vizinhos mais próximos.
-            dimension = stats.get('dimension', config.EMBEDDING_DIMENSION)
-            dummy_vector = [0.0] * dimension
+            # Cria vetores de busca aleatórios unitários do tamanho correto
+            # para ver quais são os vizinhos mais próximos. Um vetor nulo deixa
+            # a similaridade de cosseno indefinida; a semente fixa torna a sonda reprodutível.
+            dimension = stats['dimension']
+            rng = np.random.default_rng(0)
+            probes = rng.standard_normal((PROBE_COUNT, dimension), dtype=np.float32)
+            probes /= np.linalg.norm(probes, axis=1, keepdims=True)
             
-            query_response = index.query(
-                vector=dummy_vector,
-                top_k=3,  # Pede para trazer os 3 vetores mais próximos
-                include_metadata=True
+            # A sonda varre só o namespace mais populado em vez de todos
+            namespace = max(stats['namespaces'], key=stats['namespaces'].get, default="")
+            
+            if index is None:
+                index = await asyncio.to_thread(_index, config.PINECONE_INDEX_NAME)
+            
+            def run_probe(probe):
+                # A própria sonda já traz o detalhamento (3 vizinhos com metadados),
+                # sem um segundo round-trip; os valores dos vetores nunca são necessários
+                return index.query(
+                    vector=probe.tolist(),
+                    top_k=3,
+                    include_metadata=True,
+                    include_values=False,
+                    namespace=namespace
+                )
+            
+            # Com mais de uma sonda, os RPCs saem juntos em vez de em sequência
+            responses = await asyncio.gather(
+                *(asyncio.to_thread(run_probe, probe) for probe in probes)
             )
             
-            if query_response['matches']:
+            query_response = next((r for r in responses if r['matches']), None)
+            
+            if query_response is not None:
                 logger.info("✅ SUCESSO! A busca genérica encontrou dados. O índice está funcionando.")
-                print("\n--- DETALHES DOS VETORES ENCONTRADOS ---\n")
+                # Monta o relatório inteiro em memória e escreve de uma vez só
+                buf = io.StringIO()
+                print("\n--- DETALHES DOS VETORES ENCONTRADOS ---\n", file=buf)
                 for match in query_response['matches']:
-                    print(f"ID do Vetor: {match['id']}")
-                    print(f"Score de Similaridade: {match['score']:.4f}")
-                    print("Metadados:")
-                    pp.pprint(match['metadata'])
-                    print("-" * 50 + "\n")
-            else:
-                logger.error("❌ FALHA! O índice reporta ter vetores, mas a busca não retornou nada.")
-                logger.error("Isso pode indicar um problema de indexação no Pinecone. Tente novamente em alguns minutos.")
+                    print(f"ID do Vetor: {match['id']}", file=buf)
+                    print(f"Score de Similaridade: {match['score']:.4f}", file=buf)
+                    print("Metadados:", file=buf)
+                    print(orjson.dumps(match['metadata'], option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS).decode(), file=buf)
+                    print("-" * 50 + "\n", file=buf)
+                sys.stdout.write(buf.getvalue())
+                sys.stdout.flush()
+                return True
+            
+            logger.error("❌ FALHA! O índice reporta ter vetores, mas a busca não retornou nada.")
+            logger.error("Isso pode indicar um problema de indexação no Pinecone. Tente novamente em alguns minutos.")
+            return False
 
-        else:
-            logger.warning("O índice está vazio. Nenhum dado para visualizar.")
-            logger.info("Execute o script 'ingest_enriched_to_pinecone.py' para popular o índice.")
+        logger.warning("O índice está vazio. Nenhum dado para visualizar.")
+        logger.info("Execute o script 'ingest_enriched_to_pinecone.py' para popular o índice.")
+        return False
 
-    except Exception as e:
-        logger.critical(f"Ocorreu um erro ao se comunicar com o Pinecone: {e}", exc_info=True)
+    except Exception:
+        # Nunca deixa um estado em cache mascarar uma falha real
+        stats_cache.delete(cache_key)
+        logger.exception("Ocorreu um erro ao se comunicar com o Pinecone", extra={"index": config.PINECONE_INDEX_NAME})
+        return False
 
 
 if __name__ == "__main__":
-    verify_pinecone_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Verifica os dados do índice Pinecone")
+    parser.add_argument("--ping", action="store_true",
+                        help="apenas confere se o índice existe e tem vetores (sem busca)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="ignora o cache local de estatísticas (implícito em --ping)")
+    args = parser.parse_args()
+    ok = asyncio.run(verify_pinecone_data(ping=args.ping, use_cache=not args.no_cache))
+    sys.exit(0 if ok else 1)
\ No newline at end of file